@@ -1,10 +1,62 @@
-from flask import Flask, request, json, render_template_string
+from flask import Flask, Response, request
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import atexit
+import functools
+import logging
 import os
+import queue
+import re
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from urllib.parse import urlencode
+from cachetools import TTLCache, cached
 from dotenv import load_dotenv
+from flask_caching import Cache
 
 app = Flask(__name__)
 
+# Logs are put on a queue and written to the terminal by a background listener thread,
+# so request handlers never block on stdout (the listener is started by _start_log_listener)
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+_log_queue_handler = QueueHandler(queue.Queue(-1))
+_log_listener_lock = threading.Lock()
+_log_listener_pid = None
+
+logger = logging.getLogger(__name__)
+logger.addHandler(_log_queue_handler)
+logger.setLevel(logging.INFO)
+logger.propagate = False
+
+
+@app.before_request
+def _start_log_listener():
+    """
+    Starts the log listener thread once per process, on its first request. Threads do not
+    survive a fork, so every gunicorn worker (preloaded or not) starts its own listener here.
+    """
+    global _log_listener_pid
+    if _log_listener_pid == os.getpid():
+        return
+    with _log_listener_lock:
+        if _log_listener_pid != os.getpid():
+            # Every process gets a fresh queue, one inherited across a fork can still be
+            # waited on by the parent's (now dead) listener thread and would swallow wake-ups
+            log_queue = queue.Queue(-1)
+            _log_queue_handler.queue = log_queue
+            listener = QueueListener(log_queue, _log_handler)
+            listener.start()
+            atexit.register(listener.stop)
+            _log_listener_pid = os.getpid()
+
+# Short-lived cache for the rendered /transfer page so refreshes, double-clicks
+# and QC retries of the same record do not repeat the whole REDCap export/import
+TRANSFER_CACHE_TIMEOUT = 30 # seconds
+cache = Cache(app, config={'CACHE_TYPE': 'SimpleCache', 'CACHE_DEFAULT_TIMEOUT': TRANSFER_CACHE_TIMEOUT})
+
 # --- CONFIGURATION ---
 # API Tokens are managed via .env file which is in .gitignore to maintain HIPAA compliance and security
 load_dotenv()
@@ -12,18 +64,272 @@ API_TOKEN_A = os.getenv("REDCAP_TOKEN_NON_CONSENT_Database")
 API_TOKEN_B = os.getenv("REDCAP_TOKEN_CONSENT_Database")
 REDCAP_API_URL = os.getenv("TRACE_AI_REDCAP_URL")
 
+# A single pooled session is shared by every handler so REDCap calls reuse the same
+# keep-alive TLS connection instead of doing a fresh handshake on every POST
+SESSION = requests.Session()
+SESSION.headers['Connection'] = 'keep-alive'
+adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504])
+)
+SESSION.mount('https://', adapter)
+
+# Timeout (seconds) applied to every REDCap API call
+REDCAP_TIMEOUT = 10
+
+# Imports into Project B from concurrent /transfer calls are coalesced: the call that finds no import
+# in flight sends everything queued so far (up to IMPORT_BATCH_SIZE records) as one REDCap array import,
+# and calls arriving meanwhile queue up and go out together in the next POST (see _import_record).
+# A lone caller is never held back. A caller waits for the batches queued ahead of it plus its own, each batch
+# being one POST, or 1 + 2*log2(IMPORT_BATCH_SIZE) = 11 POSTs when REDCap rejects one bad record in it (see _import_batch).
+# Every POST is bounded by REDCAP_TIMEOUT (plus the adapter's connection retries), so there is no separate wait timeout.
+IMPORT_BATCH_SIZE = 32
+
+# /transfer remembers each record's consent choice (once its import is confirmed) so /trigger-email
+# (clicked right after) does not need to read it back from Project B. Guarded by a lock since handlers run concurrently.
+CONSENT_CACHE = TTLCache(maxsize=1024, ttl=900)
+CONSENT_CACHE_LOCK = threading.Lock()
+
+# Shape of a valid REDCap record id, anything else is rejected before contacting REDCap
+_REC_RE = re.compile(r'[A-Za-z0-9_-]{1,32}')
+
+# The only fields from Project A that are sent to Project B (the consent database)
+_B_KEYS = ('pt_email', 'pt_phone', 'res_email', 'elig_date')
+# This sets the form status to 'Complete' (2) in Project B
+_B_CONST = {
+    'trace_ai_eligibility_screening_draft_complete': '2',
+    'record_set_up_complete': '2'
+}
+
+# Alert trigger field set in Project B for each consent choice
+_TRIGGER = {
+    '1': ('trigger_email', '1'), # Electronic Consent Alert
+    '2': ('cons_in_person_email', '1') # In-Person Consent Alert
+}
+
+# The fixed part of every REDCap form body is urlencoded once here,
+# each request then only encodes its own fields (see _form_body)
+_FORM_HDRS = {'Content-Type': 'application/x-www-form-urlencoded'}
+# The export asks Project A only for the fields that are used, which keeps the response small
+# (its record id field is not requested: its name is not assumed and /transfer uses the query arg)
+_A_FIELDS = ('interested_consent',) + _B_KEYS
+_EXPORT_PREFIX = urlencode({
+    'token': API_TOKEN_A,
+    'content': 'record',
+    'format': 'json',
+    'type': 'flat',
+    'exportSurveyFields': 'true',
+    **{f'fields[{i}]': field for i, field in enumerate(_A_FIELDS)}
+})
+_B_FORM_PREFIX = urlencode({
+    'token': API_TOKEN_B,
+    'content': 'record',
+    'format': 'json',
+    'type': 'flat'
+})
+# Only the consent field is requested so REDCap does not send back the whole record
+_CONSENT_READ_PREFIX = _B_FORM_PREFIX + '&' + urlencode({
+    'rawOrLabel': 'raw',
+    'fields[0]': 'record_id',
+    'fields[1]': 'interested_consent',
+    'returnFormat': 'json'
+})
+
+
+def _form_body(prefix, fields):
+    """
+    Appends the per-request fields to one of the prebuilt REDCap form prefixes.
+    """
+    return f"{prefix}&{urlencode(fields)}"
+
 
+def _dumps(obj):
+    """
+    Serializes a REDCap 'data' form field (a JSON string) with orjson.
+    """
+    return orjson.dumps(obj).decode()
 
-# This verifies a secure SSL Connection to the REDCap Server
-try:
-    response = requests.get(REDCAP_API_URL.split('api/')[0], timeout=10)
-    print(f"REDCAP Connection Check: {response.status_code} - Secure")
-except Exception as e:
-    print(f"Warning: Could not verify REDCap connection: {e}")
+
+
+# --- PROJECT B IMPORTS ---
+_pending_imports = [] # (record, ticket) pairs waiting to be sent
+_import_cond = threading.Condition()
+_import_in_flight = False
+
+
+class _ImportTicket:
+    """
+    Tracks one queued record: `done` once its batch has been sent and `ok` if REDCap accepted it.
+    """
+
+    def __init__(self):
+        self.done = False
+        self.ok = False
+
+
+def _post_import(records):
+    """
+    Imports a list of records into Project B with one POST and returns the REDCap status code
+    (None if REDCap could not be reached) with the set of record ids REDCap confirmed.
+    """
+    record_ids = ', '.join(str(record['record_id']) for record in records)
+
+    # 3. Import: The necessary data from Project A is imported/copied into Project B
+    # returnContent=ids makes REDCap reply with the ids it imported, so each record can be checked
+    import_payload = _form_body(_B_FORM_PREFIX, {
+        'overwriteBehavior': 'normal',
+        'returnContent': 'ids',
+        'data': _dumps(records)
+    })
+
+    try:
+        response_b = SESSION.post(REDCAP_API_URL, data=import_payload, headers=_FORM_HDRS, timeout=REDCAP_TIMEOUT)
+    except Exception as e:
+        logger.error("Sync Error: Record(s) %s | %s", record_ids, e)
+        return None, set()
+
+    # This log is written to the output terminal to keep track of what is happening.
+    logger.info("Sync Event: Record(s) %s | Status: %s", record_ids, response_b.status_code)
+    if response_b.status_code != 200:
+        logger.error("REDCAP ERROR for Record(s) %s: %s", record_ids, response_b.text)
+        return response_b.status_code, set()
+
+    try:
+        return response_b.status_code, {str(confirmed) for confirmed in orjson.loads(response_b.content)}
+    except (orjson.JSONDecodeError, TypeError) as e:
+        logger.error("Sync Error: Record(s) %s | Unreadable import reply: %s", record_ids, e)
+        return response_b.status_code, set()
+
+
+def _import_batch(records):
+    """
+    Imports a batch into Project B and returns the ids of the records REDCap confirmed.
+    REDCap rejects the whole array (400) if any one record is invalid, so a rejected batch is split
+    in half until the bad record is isolated, instead of one record sinking the rest of the batch.
+    """
+    status, confirmed = _post_import(records)
+    if status == 200:
+        return confirmed
+    if status != 400 or len(records) == 1:
+        return set()
+
+    middle = len(records) // 2
+    return _import_batch(records[:middle]) | _import_batch(records[middle:])
+
+
+def _import_record(record):
+    """
+    Imports one cleaned record into Project B, sharing the POST with any concurrent
+    /transfer calls, and returns True once REDCap has accepted it.
+    """
+    global _import_in_flight
+    ticket = _ImportTicket()
+    with _import_cond:
+        _pending_imports.append((record, ticket))
+
+    while True:
+        with _import_cond:
+            # Another call is sending a batch, ours goes out with the next one
+            while _import_in_flight and not ticket.done:
+                _import_cond.wait()
+            if ticket.done:
+                return ticket.ok
+
+            # No import is in flight, so this call sends the oldest queued records (its own included,
+            # unless more than IMPORT_BATCH_SIZE are queued ahead of it, in which case it loops)
+            _import_in_flight = True
+            batch = _pending_imports[:IMPORT_BATCH_SIZE]
+            del _pending_imports[:IMPORT_BATCH_SIZE]
+
+        imported = set()
+        try:
+            imported = _import_batch([queued for queued, _ in batch])
+        finally:
+            with _import_cond:
+                for queued, queued_ticket in batch:
+                    queued_ticket.ok = str(queued['record_id']) in imported
+                    queued_ticket.done = True
+                _import_in_flight = False
+                _import_cond.notify_all()
+
+
+
+# --- USER INTERFACE ---
+# The pages are compiled once at import instead of being re-parsed by Jinja on every request
+
+# Dynamic page shown after /transfer, prompting the next step based on the consent choice
+TRANSFER_TEMPLATE = app.jinja_env.from_string('''
+    <div style="font-family: sans-serif; text-align: center; margin-top: 100px;">
+        <div style="border: 1px solid #ccc; display: inline-block; padding: 40px; border-radius: 10px; max-width: 500px;">
+            <h1 style="color: #2c3e50;">Eligibility Form Submitted</h1>
+            <p style="font-size: 1.1em;">Record <strong>{{ rec }}</strong> has been synced to the Consent Database.</p>
+            <hr style="margin: 25px 0;">
+            
+            {% if choice == '1' %}
+                <p>The participant selected <strong>Electronic Consent</strong>.</p>
+                <p>Click below to send the Questionnaire link to their email.</p>
+                <form action="/trigger-email" method="POST">
+                    <input type="hidden" name="rec_id" value="{{ rec }}">
+                    <button type="submit" style="background: #007bff; color: white; border: none; padding: 15px 30px; font-size: 18px; border-radius: 5px; cursor: pointer;">
+                        Send My Questionnaire
+                    </button>
+                </form>
+            {% elif choice == '2' %}
+                <p>The participant selected <strong>In-Person Consent</strong>.</p>
+                <p>Click below to trigger the internal notification for in-person setup.</p>
+                <form action="/trigger-email" method="POST">
+                    <input type="hidden" name="rec_id" value="{{ rec }}">
+                    <button type="submit" style="background: #28a745; color: white; border: none; padding: 15px 30px; font-size: 18px; border-radius: 5px; cursor: pointer;">
+                        Prepare In-Person Consent
+                    </button>
+                </form>
+            {% else %}
+                <p style="color: #e74c3c; font-weight: bold;">Warning: No consent preference was recorded (Value: {{ choice }}).</p>
+                <p>Please review the record in REDCap.</p>
+            {% endif %}
+        </div>
+    </div>
+''')
+
+
+@functools.lru_cache(maxsize=4096)
+def _render_transfer(rec, choice):
+    """
+    Renders the /transfer page. The page only depends on (rec, choice), so repeats are served from memory.
+    """
+    return TRANSFER_TEMPLATE.render(rec=rec, choice=choice)
+
+
+# Static page shown once /trigger-email has fired the REDCap alert (encoded once, served as-is)
+TRIGGER_SUCCESS_HTML = b"""
+    <div style="font-family: sans-serif; text-align: center; margin-top: 100px;">
+        <h2 style="color: #2c3e50;">Action Complete!</h2>
+        <p style="font-size: 1.1em;">The corresponding alert has been triggered in REDCap.</p>
+        <p>You may now close this window or return to the dashboard.</p>
+    </div>
+"""
+
+
+
+def _transfer_cache_key():
+    """
+    Cache key for the /transfer page of the record in the current request.
+    """
+    return f"transfer:{request.args.get('record')}"
+
+
+def _is_cacheable(response):
+    """
+    Only pages for a confirmed import are cached. Error replies, including
+    failed imports, are returned as (body, status) tuples.
+    """
+    return not isinstance(response, tuple)
 
 
 
 @app.route('/transfer', methods=['GET'])
+@cache.cached(timeout=TRANSFER_CACHE_TIMEOUT, key_prefix=_transfer_cache_key, response_filter=_is_cacheable)
 def transfer_data():
     """
     Handles the secure transfer of screened participants from 
@@ -34,20 +340,15 @@ def transfer_data():
     record_id = request.args.get('record')
     if not record_id:
         return "Error: No record ID provided.", 400
+    if not _REC_RE.fullmatch(record_id):
+        return "Error: Invalid record ID.", 400
 
     # 1. Export: The record is obtained using the record id from Project A (the non-consent redcap database)
-    export_payload = {
-        'token': API_TOKEN_A,
-        'content': 'record',
-        'format': 'json',
-        'type': 'flat',
-        'records[0]': record_id,
-        'exportSurveyFields': 'true'
-    }
+    export_payload = _form_body(_EXPORT_PREFIX, {'records[0]': record_id})
     
     try:
-        response_a = requests.post(REDCAP_API_URL, data=export_payload)
-        records = response_a.json()
+        response_a = SESSION.post(REDCAP_API_URL, data=export_payload, headers=_FORM_HDRS, timeout=REDCAP_TIMEOUT)
+        records = orjson.loads(response_a.content)
 
         if not records or len(records) == 0:
             return f"Error: Record {record_id} not found in Project TRACE-AI Prospective Study.", 404
@@ -59,31 +360,20 @@ def transfer_data():
         # 2. This ensures only the necessary fields needed are exported from Project A and sent to Project B (the consent database)
         # This maintains protocol by not transferring any unnecessary screening data
         clean_data_for_b = {
-            'record_id': record_id,
-            'pt_email': data_from_a.get('pt_email'),
-            'pt_phone': data_from_a.get('pt_phone'),
-            'res_email': data_from_a.get('res_email'),
-            'elig_date': data_from_a.get('elig_date'),
+            'record_id': record_id, # kept first, REDCap's flat import reads the record id from the first field
+            **{key: data_from_a.get(key) for key in _B_KEYS},
             'interested_consent': consent_choice, # 1=Electronic-consent, 2=In-person
-            # This sets the form status to 'Complete' (2) in Project B
-            'trace_ai_eligibility_screening_draft_complete': '2',
-            'record_set_up_complete': '2'
+            **_B_CONST
         }
 
-        # 3. Import: The necessary data from Project A is imported/copied into Project B
-        import_payload = {
-            'token': API_TOKEN_B,
-            'content': 'record',
-            'format': 'json',
-            'type': 'flat',
-            'overwriteBehavior': 'normal',
-            'data': json.dumps([clean_data_for_b])
-        }
-        
-        response_b = requests.post(REDCAP_API_URL, data=import_payload)
-        
-        # This log in printed out in output terminal to keep track of what is happening.
-        print(f"Sync Event: Record {record_id} | Status: {response_b.status_code}")
+        # 3. Import: The cleaned record is imported into Project B, together with the records of
+        # any concurrent /transfer calls (see _import_record)
+        if not _import_record(clean_data_for_b):
+            return f"Error: Record {record_id} could not be synced to the Consent Database. Please review the record in REDCap.", 502
+
+        # The record is now known to be in Project B, so /trigger-email can trust the cached choice
+        with CONSENT_CACHE_LOCK:
+            CONSENT_CACHE[record_id] = consent_choice
 
     except Exception as e:
         return f"System Error during transfer: {str(e)}", 500
@@ -92,38 +382,7 @@ def transfer_data():
 
     # 4. Dynamic User Interface: what the user sees prompting them to the next step so the email can be sent to the user via the data imported from project A to B.
     
-    return render_template_string('''
-        <div style="font-family: sans-serif; text-align: center; margin-top: 100px;">
-            <div style="border: 1px solid #ccc; display: inline-block; padding: 40px; border-radius: 10px; max-width: 500px;">
-                <h1 style="color: #2c3e50;">Eligibility Form Submitted</h1>
-                <p style="font-size: 1.1em;">Record <strong>{{ rec }}</strong> has been synced to the Consent Database.</p>
-                <hr style="margin: 25px 0;">
-                
-                {% if choice == '1' %}
-                    <p>The participant selected <strong>Electronic Consent</strong>.</p>
-                    <p>Click below to send the Questionnaire link to their email.</p>
-                    <form action="/trigger-email" method="POST">
-                        <input type="hidden" name="rec_id" value="{{ rec }}">
-                        <button type="submit" style="background: #007bff; color: white; border: none; padding: 15px 30px; font-size: 18px; border-radius: 5px; cursor: pointer;">
-                            Send My Questionnaire
-                        </button>
-                    </form>
-                {% elif choice == '2' %}
-                    <p>The participant selected <strong>In-Person Consent</strong>.</p>
-                    <p>Click below to trigger the internal notification for in-person setup.</p>
-                    <form action="/trigger-email" method="POST">
-                        <input type="hidden" name="rec_id" value="{{ rec }}">
-                        <button type="submit" style="background: #28a745; color: white; border: none; padding: 15px 30px; font-size: 18px; border-radius: 5px; cursor: pointer;">
-                            Prepare In-Person Consent
-                        </button>
-                    </form>
-                {% else %}
-                    <p style="color: #e74c3c; font-weight: bold;">Warning: No consent preference was recorded (Value: {{ choice }}).</p>
-                    <p>Please review the record in REDCap.</p>
-                {% endif %}
-            </div>
-        </div>
-    ''', rec=record_id, choice=consent_choice)
+    return _render_transfer(record_id, consent_choice)
 
 
 
@@ -133,79 +392,108 @@ def trigger_email():
     Updates the trigger field in Project B to fire the automated REDCap Alert based on the choice stored.
     """
     record_id = request.form.get('rec_id')
+    if not record_id or not _REC_RE.fullmatch(record_id):
+        return "Error: Invalid record ID.", 400
 
 
     
-    #1. This quickly fetches the choice back from Project B (either E-Consent (1) or In-Person (2)) to decide the payload:
-    
-    # First we determine WHAT they chose by pullling the data from Project B:
-    res = requests.post(REDCAP_API_URL, data={
-        'token': API_TOKEN_B,
-        'content': 'record',
-        'format': 'json',
-        'records[0]': record_id
-    })
-
-
-
-    try:
-        #choice = res.json()[0].get('interested_consent')
-        data = res.json()[0]
-        choice = str(data.get('interested_consent', ''))
-    except (IndexError, KeyError):
-        return "Error: Could not retrieve record details from Project B.", 500
+    #1. This quickly fetches the choice (either E-Consent (1) or In-Person (2)) to decide the payload.
+    # The choice recorded by /transfer is used when available, otherwise it is pulled back from Project B:
+    with CONSENT_CACHE_LOCK:
+        choice = CONSENT_CACHE.get(record_id)
+
+    if choice is None:
+        res = SESSION.post(
+            REDCAP_API_URL,
+            data=_form_body(_CONSENT_READ_PREFIX, {'records[0]': record_id}),
+            headers=_FORM_HDRS,
+            timeout=REDCAP_TIMEOUT
+        )
+
+        try:
+            #choice = res.json()[0].get('interested_consent')
+            data = orjson.loads(res.content)[0]
+            choice = str(data.get('interested_consent', ''))
+        except (IndexError, KeyError):
+            return "Error: Could not retrieve record details from Project B.", 500
+
+        with CONSENT_CACHE_LOCK:
+            CONSENT_CACHE[record_id] = choice
     
 
 
-    # 2. Logic to choose the correct Alert Variable
+    # 2. Logic to choose the correct Alert Variable (see _TRIGGER)
+    slot = _TRIGGER.get(choice)
 
-    # Initialize trigger payload
-    trigger_payload = {'record_id': record_id}
+    # No consent preference means there is no alert to fire, so we return before building
+    # a payload or contacting REDCap (a cached empty choice costs no network I/O at all)
+    if slot is None:
+        logger.info("No consent alert sent for Record %s (Choice: %s)", record_id, choice)
+        return "No alert needed for this choice.", 200
 
-
-    if choice == "1":
-        # Trigger the Electronic Consent Alert
-        trigger_payload['trigger_email'] = "1"
-        #trigger_payload['cons_in_person_email'] = "0"
-    elif choice == "2":
-        # Trigger the In-Person Consent Alert
-        #trigger_payload['trigger_email'] = "0"
-        trigger_payload['cons_in_person_email'] = "1"
-    else:
-        print(f"No consent alert sent for Record {record_id} (Choice: {choice})")
-        return "No alert needed for this choice."
+    trigger_payload = {'record_id': record_id, slot[0]: slot[1]}
 
     
 
     # Send update to Project B
-    response = requests.post(REDCAP_API_URL, data={
-        'token': API_TOKEN_B,
-        'content': 'record',
-        'format': 'json',
-        'type': 'flat',
-        'data': json.dumps([trigger_payload])
-    })
+    response = SESSION.post(
+        REDCAP_API_URL,
+        data=_form_body(_B_FORM_PREFIX, {'data': _dumps([trigger_payload])}),
+        headers=_FORM_HDRS,
+        timeout=REDCAP_TIMEOUT
+    )
     
 
-    # DEBUG: This will print the EXACT error from REDCap if it's 400
+    # DEBUG: This will log the EXACT error from REDCap if it's 400
     if response.status_code != 200:
-        print(f"REDCAP ERROR for Record {record_id}: {response.text}")
+        logger.error("REDCAP ERROR for Record %s: %s", record_id, response.text)
     else:
-        print(f"Success! Record {record_id} updated. Choice: {choice}")
+        logger.info("Success! Record %s updated. Choice: %s", record_id, choice)
 
-    print(f"Email Alert Triggered: Record {record_id} | Response: {response.text}. |  Status: {response.status_code} for Choice {choice}")
+    logger.info("Email Alert Triggered: Record %s | Response: %s. |  Status: %s for Choice %s", record_id, response.text, response.status_code, choice)
 
-    
-    return """
-        <div style="font-family: sans-serif; text-align: center; margin-top: 100px;">
-            <h2 style="color: #2c3e50;">Action Complete!</h2>
-            <p style="font-size: 1.1em;">The corresponding alert has been triggered in REDCap.</p>
-            <p>You may now close this window or return to the dashboard.</p>
-        </div>
+    # The success page is only shown (and may only be cached by the browser) once REDCap accepted the update
+    if response.status_code != 200:
+        return f"Error: REDCap did not accept the alert trigger for Record {record_id}. Please review the record in REDCap.", 502
+
+    return Response(
+        TRIGGER_SUCCESS_HTML,
+        content_type='text/html; charset=utf-8',
+        headers={'Cache-Control': 'public, max-age=300'}
+    )
+
+
+
+
+# This verifies a secure SSL Connection to the REDCap Server. It runs on health checks rather than
+# at import, so startup (and every gunicorn worker fork) is not held up by REDCap
+@cached(TTLCache(maxsize=1, ttl=60), lock=threading.Lock())
+def _probe():
+    """
+    Checks the REDCap server and returns its status code. A 2xx answer is reused for 60 seconds,
+    anything else raises (and is not cached) so that the next health check probes again.
+    """
+    status = SESSION.get(REDCAP_API_URL.split('api/')[0], timeout=2).status_code
+    if not 200 <= status < 300:
+        raise RuntimeError(f"REDCap answered with status {status}")
+    return status
+
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """
+    Reports whether the REDCap server is reachable (503 when it is not).
     """
+    try:
+        return f"REDCAP Connection Check: {_probe()} - Secure"
+    except Exception as e:
+        return f"Warning: Could not verify REDCap connection: {e}", 503
 
 
 
 if __name__ == '__main__':
-    # Debug mode is set to False for production/EC2 deployment
+    # The Flask dev server runs a thread per request with no worker processes or production hardening,
+    # so it is only used for local development. Production/EC2 runs under gunicorn with gevent workers (see gunicorn.conf.py)
+    if os.getenv('FLASK_ENV') != 'development':
+        raise SystemExit("Use gunicorn in production: gunicorn final_trace_ai_redcap_api_script:app (set FLASK_ENV=development to use the dev server)")
     app.run(debug=False, port=5000)
\ No newline at end of file
@@ -0,0 +1,18 @@
+# Production/EC2 server settings. gunicorn reads this file automatically when started from this folder:
+#   gunicorn final_trace_ai_redcap_api_script:app
+
+import multiprocessing
+
+bind = "0.0.0.0:5000"
+
+# gevent workers let a worker blocked on a REDCap POST yield to other requests instead of stalling.
+# The gevent worker applies gevent's monkey patching itself, inside each worker after the fork and
+# before the app is imported, so it is not done here (this file is also loaded by the master process,
+# which must stay unpatched, and by runs that pick another worker class with -k).
+worker_class = "gevent"
+workers = multiprocessing.cpu_count()
+worker_connections = 1000
+
+# The app (and the locks it creates at import) must be loaded after the worker has patched
+# sockets/threads, so it is not preloaded in the unpatched master
+preload_app = False
@@ -1,5 +1,7 @@
+import argparse
 import requests
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # List your 16 Record IDs here (ensure these exist in Project A)
 records = [str(i) for i in range(30, 46)]
@@ -7,37 +9,60 @@ records = [str(i) for i in range(30, 46)]
 # Your Flask address
 BASE_URL = "http://127.0.0.1:5000/transfer"
 
-print("---STARTING QC BATCH TEST---")
-print("-" * 50)
+# Number of records tested at the same time (ignored with --serial)
+MAX_WORKERS = 8
+
+# One shared session so the test reuses connections to Flask
+sess = requests.Session()
+
 
-for rid in records:
-    print(f"Testing Record {rid}: ", end="")
+def check_record(rid):
+    """
+    Runs /transfer for one record and returns the QC result line for it.
+    """
     try:
         # Your Flask app uses GET and expects 'record'
-        response = requests.get(BASE_URL, params={'record': rid})
-        
+        response = sess.get(BASE_URL, params={'record': rid}, timeout=30)
+
         if response.status_code == 200:
             # Check if it was In-person or Electronic in the HTML response
             if "Electronic Consent" in response.text:
-                print("SUCCESS [Electronic Consent]")
+                return "SUCCESS [Electronic Consent]"
             elif "In-Person Consent" in response.text:
-                print("SUCCESS [In-Person Consent]")
+                return "SUCCESS [In-Person Consent]"
             else:
-                print("SUCCESS [Synced]")
-        
+                return "SUCCESS [Synced]"
+
         elif response.status_code == 404:
-            print("FAILED | Record not found in Project A.")
-        
+            return "FAILED | Record not found in Project A."
+
         elif response.status_code == 400:
-            print("FAILED | Missing Record ID.")
-            
+            return "FAILED | Missing or invalid Record ID."
+
         else:
-            print(f"ERROR | Status: {response.status_code}")
-            
+            return f"ERROR | Status: {response.status_code}"
+
     except Exception as e:
-        print(f"CONNECTION ERROR | Is Flask running?: {e}")
+        return f"CONNECTION ERROR | Is Flask running?: {e}"
+
+
+parser = argparse.ArgumentParser(description="QC batch test for the TRACE-AI REDCap transfer API.")
+parser.add_argument('--serial', action='store_true', help="test the records one at a time (for debugging)")
+args = parser.parse_args()
+
+print("---STARTING QC BATCH TEST---")
+print("-" * 50)
+start = time.perf_counter()
 
-    time.sleep(0.5)
+if args.serial:
+    for rid in records:
+        print(f"Testing Record {rid}: {check_record(rid)}")
+else:
+    # All records are sent concurrently and reported in the order they finish
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        futs = {ex.submit(check_record, rid): rid for rid in records}
+        for fut in as_completed(futs):
+            print(f"Testing Record {futs[fut]}: {fut.result()}")
 
 print("-" * 50)
-print("Batch Test Complete. Check your Flask terminal for Sync logs.")
+print(f"Batch Test Complete in {time.perf_counter() - start:.2f}s. Check your Flask terminal for Sync logs.")